@@ -0,0 +1,223 @@
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+
+from . import exceptions
+from .client_base import ClientBase
+from .request import _HEADER_LEN, _HEADER_STRUCT
+
+
+_Response = TypeVar("_Response")
+
+
+class AsyncInternalClient(ClientBase):
+    """Asyncio variant of InternalClient. Many clients can share one event loop thread
+       since no call blocks while waiting for the server. Concurrent send_status calls
+       on one instance are serialized.
+    """
+
+    __slots__ = ("_reader", "_writer", "_send_lock")
+
+    def __init__(
+        self,
+        module_id: int,
+        hostname: str,
+        port: int,
+        device_name: str,
+        device_type: int,
+        device_role: str,
+        device_priority: int = 0,
+        ) -> None:
+        """Initialize context. Use AsyncInternalClient.create to also connect to server.
+
+        Args:
+            module_id (int): Module ID
+            hostname (str): IP of server (module gateway)
+            port (int): Port
+            device_name (str): Name of this device
+            device_type (int): Module specific device type
+            device_role (str): Device role
+            device_priority (int, optional): Priority of device. Defaults to 0.
+        """
+        super().__init__(
+            module_id, hostname, port, device_name, device_type, device_role, device_priority
+        )
+        self._reader:None|asyncio.StreamReader = None
+        self._writer:None|asyncio.StreamWriter = None
+        self._send_lock = asyncio.Lock()
+
+    @classmethod
+    async def create(
+        cls,
+        module_id: int,
+        hostname: str,
+        port: int,
+        device_name: str,
+        device_type: int,
+        device_role: str,
+        device_priority: int = 0,
+        ) -> "AsyncInternalClient":
+        """Initialize context and connect to desired server.
+
+        Raises:
+            exceptions.ConnectionRefused: Could not establish connection with server.
+            exceptions.CommunicationError: Error in communication with server.
+            exceptions.ServerTookTooLong: Server did not respond in time.
+
+            Any of exceptions.ConnectExceptions: Server did not allow device to connect.
+        """
+        client = cls(module_id, hostname, port, device_name, device_type, device_role, device_priority)
+        await client._establish_connection()
+        return client
+
+    def destroy(self) -> None:
+        """Destroy context and disconnect from server without waiting for connection to close.
+           Use close to also wait for it.
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = None
+            self._writer = None
+            self._is_connected = False
+
+    async def close(self) -> None:
+        """Destroy context and wait until connection to server is closed."""
+        writer = self._writer
+        self.destroy()
+        if writer is not None:
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def send_status(self, data: bytes | bytearray | memoryview, timeout: int) -> None:
+        """Send device status. If status was not sent
+           before timeout or another error occured,
+           will try to reconnect and reestablish connection.
+
+        Args:
+            data (bytes | bytearray | memoryview): binary data of status
+            timeout (int): max time to wait for send
+
+        Raises:
+            exceptions.ContextAlreadyDestroyed: Current context is invalid and was destroyed.
+            ValueError: Negative timeout.
+            Any of exceptions.CommunicationExceptions: Error occured in communication and
+                connection was not reestablished.
+            Any of exceptions.ConnectExceptions: Server didn't allow device to connect.
+        """
+        if timeout < 0:
+            raise ValueError("Timeout must be positive.")
+
+        status_message = self._create_DeviceStatus_message(data)
+        # status and its command (including reconnection) must not interleave with another call
+        async with self._send_lock:
+            if self._writer is None:
+                raise exceptions.ContextAlreadyDestroyed
+            command_res = await self._send_with_reconnect(
+                lambda: self._send_request(status_message, timeout=timeout)
+            )
+            self._process_command_response(command_res)
+
+    def get_command(self) -> bytes:
+        """Get last available command.
+
+        Raises:
+            exceptions.ContextAlreadyDestroyed: Current context is invalid and was destroyed.
+            exceptions.NoCommandError: Send status was not called and no command is available.
+
+        Returns:
+            bytes: Command binary data
+        """
+        if self._writer is None:
+            raise exceptions.ContextAlreadyDestroyed
+        if self._current_command is None:
+            raise exceptions.NoCommandError("There is no command available, call send_status first.")
+        return self._current_command
+
+    async def _send_with_reconnect(self, send: Callable[[], Awaitable[_Response]]) -> _Response:
+        status_sent, result = await self._try_send(send)
+        if status_sent:
+            return result
+        self._send_failed()
+
+        # status send was not successful, try to reconnect and send again
+        tried = 0
+        while tried < AsyncInternalClient.SEND_RETRY_COUNT:
+            self._resend_started(tried)
+            try:
+                await self._establish_connection()
+            except exceptions.CommunicationExceptions as e:
+                result = e
+            except exceptions.ConnectExceptions:
+                self._reconnect_refused()
+                raise
+            else:
+                status_sent, result = await self._try_send(send)
+                if status_sent:
+                    self._resend_succeeded(tried)
+                    return result
+            tried += 1
+
+        self._resend_failed(tried, result)
+
+    async def _try_send(
+        self, send: Callable[[], Awaitable[_Response]]
+    ) -> tuple[bool, _Response | exceptions.CommunicationExceptions]:
+        """Return (True, response) or (False, error) for transport errors which are handled by reconnecting."""
+        try:
+            return True, await send()
+        except exceptions.CommunicationExceptions as e:
+            return False, e
+
+    async def _establish_connection(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+        last_exception = exceptions.ConnectionRefused
+        tried_count = 0
+        while tried_count < AsyncInternalClient.CONNECTION_RETRY_COUNT:
+            self._connection_attempt_started(tried_count)
+            try:
+                self._reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_connection(self._hostname, self._port),
+                    timeout=AsyncInternalClient.CONNECTION_TIMEOUT,
+                )
+                self._set_socket_options(self._writer.get_extra_info("socket"))
+                await self._connection_sequence()
+            except self._CONNECTION_ERRORS as e:
+                last_exception = self._connection_attempt_failed(e)
+            else:
+                self._connection_established()
+            tried_count += 1
+
+        if not self._is_connected:
+            self._connection_failed(last_exception)
+
+    async def _send_request(self, msg: bytes, timeout: int) -> bytes:
+        try:
+            return await asyncio.wait_for(self._request(msg), timeout=timeout)
+        except (TimeoutError, asyncio.TimeoutError):
+            raise exceptions.ServerTookTooLong from None
+        except ConnectionError as e:
+            raise exceptions.CommunicationError(e) from None
+
+    async def _connection_sequence(self) -> None:
+        DeviceConnect_msg = self._create_DeviceConnect_message()
+        response = await asyncio.wait_for(
+            self._request(DeviceConnect_msg), timeout=AsyncInternalClient.CONNECTION_TIMEOUT
+        )
+
+        self._process_connect_response(response)
+
+    async def _request(self, msg: bytes) -> bytes:
+        self._writer.write(_HEADER_STRUCT.pack(len(msg)))
+        self._writer.write(msg)
+        await self._writer.drain()
+
+        try:
+            header = await self._reader.readexactly(_HEADER_LEN)
+            return await self._reader.readexactly(_HEADER_STRUCT.unpack(header)[0])
+        except asyncio.IncompleteReadError as e:
+            raise exceptions.CommunicationError(
+                f"Expected {e.expected}, got {len(e.partial)} Bytes."
+            ) from None
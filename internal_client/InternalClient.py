@@ -1,23 +1,23 @@
+import errno
+import os
+import selectors
 import socket
-import logging
+import time
+from typing import Callable, TypeVar
 
-from .protobuf_clients import InternalProtocol_pb2 as internalProto
 from . import exceptions
-from .request import Request
+from .client_base import ClientBase
+from .request import PipelinedRequest, Request
 
 
-class InternalClient:
+_Response = TypeVar("_Response")
+# connect_ex results of non-blocking connect still in progress, Windows uses WSAEWOULDBLOCK
+_CONNECT_IN_PROGRESS = (errno.EINPROGRESS, errno.EWOULDBLOCK, getattr(errno, "WSAEWOULDBLOCK", errno.EWOULDBLOCK))
 
-    CONNECTION_TIMEOUT = 1
-    CONNECTION_RETRY_COUNT = 1
-    SEND_RETRY_COUNT = 1
 
-    CONNECT_RESPONSE_EXCEPTIONS = {
-        1: exceptions.AlreadyConnected,
-        2: exceptions.ModuleNotSupported,
-        3: exceptions.DeviceNotSupported,
-        4: exceptions.HigherPriorityAlreadyConnected,
-    }
+class InternalClient(ClientBase):
+
+    __slots__ = ("_client_socket", "_addrinfos")
 
     def __init__(
         self,
@@ -47,29 +47,13 @@ class InternalClient:
 
             Any of exceptions.ConnectExceptions: Server did not allow device to connect.
         """
-        self._module_id = module_id
-        self._hostname = hostname
-        self._port = port
-        self._device_name = device_name
-        self._device_type = device_type
-        self._device_role = device_role
-        self._device_priority = device_priority
-
-        self._logger = logging.getLogger(f"InternalClient({self._device_name})")
-        self._init_device_message()
-
+        super().__init__(
+            module_id, hostname, port, device_name, device_type, device_role, device_priority
+        )
         self._client_socket:None|socket.socket = None
-        self._current_command = None
-        self._is_connected = False
+        self._addrinfos:None|list[tuple] = None
         self._establish_connection()
 
-    @property
-    def is_connected(self) -> bool:
-        return self._is_connected
-
-    def __repr__(self) -> str:
-        return f"InternalClient(moduleId={self._module_id}, deviceName={self._device_name}, deviceType={self._device_type}, priority={self._device_priority})."
-
     def destroy(self) -> None:
         """Destroy context and disconnect from server."""
         if self._client_socket is not None:
@@ -77,13 +61,13 @@ class InternalClient:
             self._client_socket = None
             self._is_connected = False
 
-    def send_status(self, data: bytes, timeout: int) -> None:
+    def send_status(self, data: bytes | bytearray | memoryview, timeout: int) -> None:
         """Send device status (blocking). If status was not sent
            before timeout or another error occured,
            will try to reconnect and reestablish connection.
 
         Args:
-            data (bytes): binary data of status
+            data (bytes | bytearray | memoryview): binary data of status
             timeout (int): max time to wait for send
 
         Raises:
@@ -98,50 +82,51 @@ class InternalClient:
         if timeout < 0:
             raise ValueError("Timeout must be positive.")
 
-        # try to send status
         status_message = self._create_DeviceStatus_message(data)
-        try:
-            command_res = self._send_request(status_message, timeout=timeout)
-        except (exceptions.CommunicationError, exceptions.ServerTookTooLong):
-            self._logger.error("Send_status unsuccessful, will try to reconnect.")
-            status_sent = False
-            self._is_connected = False
-        else:
-            status_sent = True
+        command_res = self._send_with_reconnect(
+            lambda: self._send_request(status_message, timeout=timeout)
+        )
+        self._process_command_response(command_res)
+
+    def send_statuses(self, datas: list[bytes | bytearray | memoryview], timeout: int) -> list[bytes]:
+        """Send multiple device statuses at once (blocking) and return commands
+           received for them. Statuses are written to the socket without waiting
+           for responses, so server has to support pipelined requests. Batch should fit
+           into socket buffers, otherwise sending can time out while server waits
+           for its responses to be read. Reconnects and resends all statuses on error
+           same as send_status.
 
-        # if status send was not successful, try to reconnect and send again
-        tried = 0
-        while tried < InternalClient.SEND_RETRY_COUNT and not status_sent:
-            self._logger.info(f"Trying to reestablish connection and send status.")
-            try:
-                self._establish_connection()
-                command_res = self._send_request(status_message, timeout=timeout)
-            except exceptions.CommunicationExceptions as e:
-                last_exception = e
-            except exceptions.ConnectExceptions as e:
-                # don't try again since server responded with DeviceConnectResponse.responseType != OK
-                self.destroy()
-                raise e
-            else:
-                self._logger.info(
-                    f"Status was successfully sent after {tried+1} reconnection{'s' if tried+1>1 else ''}."
-                )
-                status_sent = True
-                break
-            tried += 1
+        Args:
+            datas (list[bytes | bytearray | memoryview]): binary data of statuses
+            timeout (int): max time to wait for each receive
 
-        if not status_sent:
-            self._logger.error(
-                f"Status was not sent after {tried} reconnection{'s' if tried > 1 else ''}. Context is invalid."
-            )
-            self.destroy()
-            raise last_exception
+        Raises:
+            exceptions.ContextAlreadyDestroyed: Current context is invalid and was destroyed.
+            ValueError: Negative timeout.
+            Any of exceptions.CommunicationExceptions: Error occured in communication and
+                connection was not reestablished.
+            Any of exceptions.ConnectExceptions: Server didn't allow device to connect.
 
-        InternalServer_msg = internalProto.InternalServer.FromString(command_res)
-        if not InternalServer_msg.HasField("deviceCommand"):
-            self._logger.error(f"DeviceCommand missing in InternalServer message.")
-            raise exceptions.CommunicationError("Invalid InternalServer message.")
-        self._current_command = InternalServer_msg.deviceCommand.commandData
+        Returns:
+            list[bytes]: Command binary data for each status, last one is also available
+                from get_command
+        """
+        if self._client_socket is None:
+            raise exceptions.ContextAlreadyDestroyed
+        if timeout < 0:
+            raise ValueError("Timeout must be positive.")
+        if not datas:
+            return []
+
+        status_messages = [self._create_DeviceStatus_message(data) for data in datas]
+        command_responses = self._send_with_reconnect(
+            lambda: self._send_requests(status_messages, timeout=timeout)
+        )
+        commands = []
+        for command_res in command_responses:
+            self._process_command_response(command_res)
+            commands.append(self._current_command)
+        return commands
 
     def get_command(self) -> bytes:
         """Get last available command.
@@ -159,50 +144,97 @@ class InternalClient:
             raise exceptions.NoCommandError("There is no command available, call send_status first.")
         return self._current_command
 
-    def _init_device_message(self) -> None:
-        device = internalProto.Device()
+    def _send_with_reconnect(self, send: Callable[[], _Response]) -> _Response:
+        status_sent, result = self._try_send(send)
+        if status_sent:
+            return result
+        self._send_failed()
 
-        device.module = self._module_id
-        device.deviceType = self._device_type
-        device.deviceName = self._device_name
-        device.deviceRole = self._device_role
-        device.priority = self._device_priority
+        # status send was not successful, try to reconnect and send again
+        tried = 0
+        while tried < InternalClient.SEND_RETRY_COUNT:
+            self._resend_started(tried)
+            try:
+                self._establish_connection()
+            except exceptions.CommunicationExceptions as e:
+                result = e
+            except exceptions.ConnectExceptions:
+                self._reconnect_refused()
+                raise
+            else:
+                status_sent, result = self._try_send(send)
+                if status_sent:
+                    self._resend_succeeded(tried)
+                    return result
+            tried += 1
 
-        self._device_message = device
+        self._resend_failed(tried, result)
+
+    def _try_send(
+        self, send: Callable[[], _Response]
+    ) -> tuple[bool, _Response | exceptions.CommunicationExceptions]:
+        """Return (True, response) or (False, error) for transport errors which are handled by reconnecting."""
+        try:
+            return True, send()
+        except exceptions.CommunicationExceptions as e:
+            return False, e
 
     def _establish_connection(self) -> None:
         if self._client_socket is not None:
             self._client_socket.close()
 
+        last_exception = exceptions.ConnectionRefused
         tried_count = 0
         while tried_count < InternalClient.CONNECTION_RETRY_COUNT:
+            self._connection_attempt_started(tried_count)
             try:
-                self._logger.info(
-                    f"{'Retrying. ' if tried_count else ''}Connecting to {self._hostname}:{self._port}."
-                )
-                self._client_socket = socket.create_connection(
-                    (self._hostname, self._port), timeout=InternalClient.CONNECTION_TIMEOUT
-                )
+                self._client_socket = self._connect()
+                self._set_socket_options(self._client_socket)
                 self._connection_sequence()
-            except (TimeoutError, socket.timeout, exceptions.ServerTookTooLong):
-                self._logger.error(f"Connection timed-out.")
-                last_exception = exceptions.ServerTookTooLong
-            except ConnectionError as e:
-                self._logger.error(f"{e}")
-                last_exception = exceptions.ConnectionRefused
-            except exceptions.CommunicationError as e:
-                self._logger.error(f"Communication Error while connecting: {e}.")
-                last_exception = exceptions.CommunicationError
+            except self._CONNECTION_ERRORS as e:
+                last_exception = self._connection_attempt_failed(e)
             else:
-                self._is_connected = True
-                self._logger.info(f"Connected to server.")
+                self._connection_established()
             tried_count += 1
 
         if not self._is_connected:
-            self.destroy()
-            raise last_exception(
-                f"Couldn't establish connection to server. Tried {InternalClient.CONNECTION_RETRY_COUNT} times. Context is invalid."
-            )
+            self._connection_failed(last_exception)
+
+    def _connect(self) -> socket.socket:
+        """Connect to one of server addresses, all attempts share CONNECTION_TIMEOUT.
+           Server address is resolved only on first connect.
+        """
+        if self._addrinfos is None:
+            self._addrinfos = socket.getaddrinfo(self._hostname, self._port, type=socket.SOCK_STREAM)
+
+        deadline = time.monotonic() + InternalClient.CONNECTION_TIMEOUT
+        last_error: OSError = TimeoutError("Connection timed-out.")
+        with selectors.DefaultSelector() as selector:
+            for family, sock_type, proto, _, address in self._addrinfos:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                sock = socket.socket(family, sock_type, proto)
+                sock.setblocking(False)
+                error = sock.connect_ex(address)
+                if error in _CONNECT_IN_PROGRESS:
+                    selector.register(sock, selectors.EVENT_WRITE)
+                    ready = selector.select(remaining)
+                    selector.unregister(sock)
+                    if not ready:
+                        sock.close()
+                        last_error = TimeoutError("Connection timed-out.")
+                        continue
+                    error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+
+                if error:
+                    sock.close()
+                    last_error = OSError(error, os.strerror(error))
+                    continue
+                sock.settimeout(InternalClient.CONNECTION_TIMEOUT)
+                return sock
+
+        raise last_error
 
     def _send_request(self, msg: bytes, timeout: int) -> bytes:
         self._client_socket.settimeout(timeout)
@@ -215,43 +247,20 @@ class InternalClient:
 
         return response
 
-    def _connection_sequence(self) -> None:
-        DeviceConnect_msg = self._create_DeviceConnect_message()
-        req = Request(self._client_socket, DeviceConnect_msg)
-        response = req.send_request()
+    def _send_requests(self, msgs: list[bytes], timeout: int) -> list[bytes]:
+        self._client_socket.settimeout(timeout)
 
-        InternalServer_msg = internalProto.InternalServer.FromString(response)
-        if not InternalServer_msg.HasField("deviceConnectResponse"):
-            self._logger.error(f"InternalServer message missing in DeviceConnectResponse.")
-            raise exceptions.CommunicationError("Invalid InternalServer message.")
+        request = PipelinedRequest(self._client_socket, msgs)
         try:
-            response_type = InternalServer_msg.deviceConnectResponse.responseType
-        except AttributeError:
-            self._logger.error(f"responseType missing in DeviceConnectResponse.")
-            raise exceptions.CommunicationError("Invalid DeviceConnectResponse message.")
-
-        if response_type != internalProto.DeviceConnectResponse.ResponseType.OK:
-            if response_type not in InternalClient.CONNECT_RESPONSE_EXCEPTIONS:
-                raise exceptions.CommunicationError(
-                    f"Invalid responseType in DeviceConnectResponse {response_type}."
-                )
-
-            raise self.CONNECT_RESPONSE_EXCEPTIONS[response_type]
-
-    def _create_DeviceConnect_message(self) -> bytes:
-        dconnect_msg = internalProto.DeviceConnect()
-        dconnect_msg.device.CopyFrom(self._device_message)
-        msg = internalProto.InternalClient()
-        msg.deviceConnect.CopyFrom(dconnect_msg)
-
-        return msg.SerializeToString()
+            responses = request.send_request()
+        except ConnectionError as e:
+            raise exceptions.CommunicationError(e) from None
 
-    def _create_DeviceStatus_message(self, status_data: bytes) -> bytes:
-        status = internalProto.DeviceStatus()
-        status.device.CopyFrom(self._device_message)
-        status.statusData = status_data
-        msg = internalProto.InternalClient()
-        msg.deviceStatus.CopyFrom(status)
+        return responses
 
-        return msg.SerializeToString()
+    def _connection_sequence(self) -> None:
+        DeviceConnect_msg = self._create_DeviceConnect_message()
+        req = Request(self._client_socket, DeviceConnect_msg)
+        response = req.send_request()
 
+        self._process_connect_response(response)
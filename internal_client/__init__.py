@@ -1,6 +1,18 @@
 __all__ = (
     "exceptions",
-    "InternalClient"
+    "InternalClient",
+    "AsyncInternalClient",
 )
 
+import os
+
+# Native (upb) protobuf backend must be selected before any generated module is imported.
+os.environ.setdefault("PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION", "upb")
+
+from google.protobuf.internal import api_implementation
+
+if api_implementation.Type() not in ("cpp", "upb"):
+    raise ImportError("Native protobuf implementation is not available.")
+
 from .InternalClient import InternalClient, exceptions
+from .AsyncInternalClient import AsyncInternalClient
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import socket
+from typing import NoReturn
+
+from google.protobuf.internal import encoder, wire_format
+
+from .protobuf_clients import InternalProtocol_pb2 as internalProto
+from . import exceptions
+
+
+_DEVICE_STATUS_TAG = encoder.TagBytes(
+    internalProto.InternalClient.DESCRIPTOR.fields_by_name["deviceStatus"].number,
+    wire_format.WIRETYPE_LENGTH_DELIMITED,
+)
+_STATUS_DATA_TAG = encoder.TagBytes(
+    internalProto.DeviceStatus.DESCRIPTOR.fields_by_name["statusData"].number,
+    wire_format.WIRETYPE_LENGTH_DELIMITED,
+)
+
+
+class ClientBase:
+    """Transport independent part of internal client. Holds device information
+       and builds and parses internal protocol messages.
+    """
+
+    __slots__ = (
+        "_module_id",
+        "_hostname",
+        "_port",
+        "_device_name",
+        "_device_type",
+        "_device_role",
+        "_device_priority",
+        "_logger",
+        "_device_message",
+        "_status_prefix",
+        "_connect_message",
+        "_current_command",
+        "_is_connected",
+        "_server_msg",
+    )
+
+    CONNECTION_TIMEOUT = 1
+    CONNECTION_RETRY_COUNT = 1
+    SEND_RETRY_COUNT = 1
+
+    # TCP keepalive: idle seconds before first probe, seconds between probes, probes before drop
+    KEEPALIVE_IDLE = 10
+    KEEPALIVE_INTERVAL = 5
+    KEEPALIVE_COUNT = 3
+
+    CONNECT_RESPONSE_EXCEPTIONS = {
+        1: exceptions.AlreadyConnected,
+        2: exceptions.ModuleNotSupported,
+        3: exceptions.DeviceNotSupported,
+        4: exceptions.HigherPriorityAlreadyConnected,
+    }
+
+    def __init__(
+        self,
+        module_id: int,
+        hostname: str,
+        port: int,
+        device_name: str,
+        device_type: int,
+        device_role: str,
+        device_priority: int = 0,
+        ) -> None:
+        self._module_id = module_id
+        self._hostname = hostname
+        self._port = port
+        self._device_name = device_name
+        self._device_type = device_type
+        self._device_role = device_role
+        self._device_priority = device_priority
+
+        self._logger = logging.getLogger(f"{type(self).__name__}({self._device_name})")
+        self._init_device_message()
+
+        self._current_command = None
+        self._is_connected = False
+        self._server_msg = internalProto.InternalServer()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._is_connected
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(moduleId={self._module_id}, deviceName={self._device_name}, deviceType={self._device_type}, priority={self._device_priority})."
+
+    # errors handled by another connection attempt, see _connection_attempt_failed
+    _CONNECTION_ERRORS = (
+        TimeoutError,
+        asyncio.TimeoutError,
+        ConnectionError,
+        exceptions.ServerTookTooLong,
+        exceptions.CommunicationError,
+    )
+
+    def destroy(self) -> None:
+        """Destroy context and disconnect from server."""
+        raise NotImplementedError
+
+    def _connection_attempt_started(self, tried_count: int) -> None:
+        self._logger.info("Connecting to %s:%s (attempt %d).", self._hostname, self._port, tried_count + 1)
+
+    def _connection_attempt_failed(self, error: Exception) -> type[exceptions.CommunicationExceptions]:
+        """Log error of one connection attempt, return exception to raise if no attempt succeeds."""
+        if isinstance(error, (TimeoutError, asyncio.TimeoutError, exceptions.ServerTookTooLong)):
+            self._logger.error("Connection timed-out.")
+            return exceptions.ServerTookTooLong
+        if isinstance(error, ConnectionError):
+            self._logger.error("%s", error)
+            return exceptions.ConnectionRefused
+        self._logger.error("Communication Error while connecting: %s.", error)
+        return exceptions.CommunicationError
+
+    def _connection_established(self) -> None:
+        self._is_connected = True
+        self._logger.info("Connected to server.")
+
+    def _connection_failed(self, exception: type[exceptions.CommunicationExceptions]) -> NoReturn:
+        self.destroy()
+        raise exception(
+            f"Couldn't establish connection to server. Tried {self.CONNECTION_RETRY_COUNT} times. Context is invalid."
+        )
+
+    def _send_failed(self) -> None:
+        self._logger.error("Send_status unsuccessful, will try to reconnect.")
+        self._is_connected = False
+
+    def _resend_started(self, tried: int) -> None:
+        self._logger.info("Trying to reestablish connection and send status (attempt %d).", tried + 1)
+
+    def _resend_succeeded(self, tried: int) -> None:
+        self._logger.info("Status was successfully sent after %d reconnection(s).", tried + 1)
+
+    def _reconnect_refused(self) -> None:
+        # don't try again since server responded with DeviceConnectResponse.responseType != OK
+        self.destroy()
+
+    def _resend_failed(self, tried: int, error: exceptions.CommunicationExceptions) -> NoReturn:
+        self._logger.error("Status was not sent after %d reconnection(s). Context is invalid.", tried)
+        self.destroy()
+        raise error
+
+    def _set_socket_options(self, sock: socket.socket) -> None:
+        """Disable Nagle's algorithm for request-response exchange and enable TCP keepalive
+           so dead server is detected without waiting for send timeout.
+        """
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        # keepalive tuning options are not available on every platform
+        for option, value in (
+            ("TCP_KEEPIDLE", self.KEEPALIVE_IDLE),
+            ("TCP_KEEPINTVL", self.KEEPALIVE_INTERVAL),
+            ("TCP_KEEPCNT", self.KEEPALIVE_COUNT),
+        ):
+            if hasattr(socket, option):
+                sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
+    def _init_device_message(self) -> None:
+        device = internalProto.Device()
+
+        device.module = self._module_id
+        device.deviceType = self._device_type
+        device.deviceName = self._device_name
+        device.deviceRole = self._device_role
+        device.priority = self._device_priority
+
+        self._device_message = device
+
+        # DeviceStatus bytes without statusData, statusData is appended in _create_DeviceStatus_message
+        status = internalProto.DeviceStatus()
+        status.device.CopyFrom(device)
+        self._status_prefix = status.SerializePartialToString()
+
+        # DeviceConnect message does not change, it is sent on every (re)connect
+        msg = internalProto.InternalClient()
+        msg.deviceConnect.device.CopyFrom(device)
+        self._connect_message = msg.SerializePartialToString()
+
+    def _process_connect_response(self, response: bytes) -> None:
+        InternalServer_msg = self._server_msg
+        InternalServer_msg.ParseFromString(response)
+        response_type = InternalServer_msg.deviceConnectResponse.responseType
+        if response_type == internalProto.DeviceConnectResponse.ResponseType.OK:
+            # OK is also the default value of missing deviceConnectResponse
+            if not InternalServer_msg.HasField("deviceConnectResponse"):
+                self._logger.error("InternalServer message missing in DeviceConnectResponse.")
+                raise exceptions.CommunicationError("Invalid InternalServer message.")
+            return
+
+        exception = self.CONNECT_RESPONSE_EXCEPTIONS.get(response_type)
+        if exception is None:
+            raise exceptions.CommunicationError(
+                f"Invalid responseType in DeviceConnectResponse {response_type}."
+            )
+        raise exception
+
+    def _process_command_response(self, response: bytes) -> None:
+        # Whole message is parsed on purpose, native protobuf parser is faster
+        # than scanning wire format for commandData in Python.
+        InternalServer_msg = self._server_msg
+        InternalServer_msg.ParseFromString(response)
+        command_data = InternalServer_msg.deviceCommand.commandData
+        # empty commandData is also returned for missing deviceCommand
+        if not command_data and not InternalServer_msg.HasField("deviceCommand"):
+            self._logger.error("DeviceCommand missing in InternalServer message.")
+            raise exceptions.CommunicationError("Invalid InternalServer message.")
+        self._current_command = command_data
+
+    def _create_DeviceConnect_message(self) -> bytes:
+        return self._connect_message
+
+    def _create_DeviceStatus_message(self, status_data: bytes | bytearray | memoryview) -> bytes:
+        # status_data is joined without copying it to bytes first. Other buffers are viewed
+        # as bytes since their len counts items, non-contiguous ones are copied as join rejects them.
+        if not isinstance(status_data, (bytes, bytearray)):
+            status_data = memoryview(status_data)
+            if status_data.c_contiguous:
+                status_data = status_data.cast("B")
+            else:
+                status_data = status_data.tobytes()
+        status = b"".join(
+            (self._status_prefix, _STATUS_DATA_TAG, encoder._VarintBytes(len(status_data)), status_data)
+        )
+        return b"".join((_DEVICE_STATUS_TAG, encoder._VarintBytes(len(status)), status))
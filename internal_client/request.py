@@ -4,7 +4,17 @@ import struct
 from . import exceptions
 
 
+_HEADER_STRUCT = struct.Struct("<I")
+_HEADER_LEN = _HEADER_STRUCT.size
+_RECV_BUFF_SIZE = 65536
+# sendmsg fails for more buffers than IOV_MAX, 1024 on Linux and macOS
+_SENDMSG_MAX_BUFFERS = 1024
+
+
 class Request:
+
+    __slots__ = ("conn", "message")
+
     def __init__(self, conn: socket.socket, message: bytes):
         self.conn = conn
         self.message = message
@@ -14,45 +24,129 @@ class Request:
         return self._retrieve()
 
     def _send(self) -> None:
-        message_header = struct.pack("<I", len(self.message))
-        self.header_len = len(message_header)
-        request_message = message_header + self.message
-
-        self.conn.sendall(request_message)
+        _send_buffers(self.conn, [_HEADER_STRUCT.pack(len(self.message)), self.message])
 
     def _retrieve(self) -> bytes:
-        response_buff = b""
-        while len(response_buff) < self.header_len:
-            try:
-                data = self.conn.recv(self.header_len)
-            except (TimeoutError, socket.timeout):
-                raise exceptions.ServerTookTooLong from None
-            if not data:
-                break
-            response_buff += data
-
-        if len(response_buff) < self.header_len:
+        response_buff = bytearray(_RECV_BUFF_SIZE)
+        view = memoryview(response_buff)
+        retrieved = _recv_into(self.conn, view, _HEADER_LEN)
+        if retrieved < _HEADER_LEN:
             raise exceptions.CommunicationError(
-                f"Expected {self.header_len}, got {len(response_buff)} Bytes."
+                f"Expected {_HEADER_LEN}, got {retrieved} Bytes."
             )
 
-        expected_response_len = struct.unpack("<I", response_buff[: self.header_len])[0]
-        response_buff = response_buff[self.header_len :]
-
-        retrieved = len(response_buff)
-        while retrieved < expected_response_len:
-            try:
-                data = self.conn.recv(1024)
-            except (TimeoutError, socket.timeout):
-                raise exceptions.ServerTookTooLong from None
-            if not data:
-                break
-            retrieved += len(data)
-            response_buff += data
-
-        if retrieved != expected_response_len:
+        expected_response_len = _HEADER_STRUCT.unpack_from(response_buff)[0]
+        response_end = _HEADER_LEN + expected_response_len
+        if response_end > len(response_buff):
+            view.release()
+            response_buff.extend(bytes(response_end - len(response_buff)))
+            view = memoryview(response_buff)
+
+        if retrieved < response_end:
+            retrieved += _recv_into(self.conn, view[retrieved:response_end], response_end - retrieved)
+        if retrieved < response_end:
+            raise exceptions.CommunicationError(
+                f"Expected {expected_response_len}, got {retrieved - _HEADER_LEN} Bytes."
+            )
+
+        return bytes(view[_HEADER_LEN:response_end])
+
+
+class PipelinedRequest:
+    """Sends all messages at once and then retrieves one response per message.
+       Server has to respond to the messages in the order they were sent.
+    """
+
+    __slots__ = ("conn", "messages")
+
+    def __init__(self, conn: socket.socket, messages: list[bytes]):
+        self.conn = conn
+        self.messages = messages
+
+    def send_request(self) -> list[bytes]:
+        self._send()
+        return self._retrieve()
+
+    def _send(self) -> None:
+        buffers = []
+        for message in self.messages:
+            buffers.append(_HEADER_STRUCT.pack(len(message)))
+            buffers.append(message)
+        _send_buffers(self.conn, buffers)
+
+    def _retrieve(self) -> list[bytes]:
+        # responses may arrive in the same recv, so unprocessed bytes are kept in response_buff[start:end]
+        response_buff = bytearray(_RECV_BUFF_SIZE)
+        start = end = 0
+        responses = []
+        for _ in self.messages:
+            response_buff, start, end = self._fill(response_buff, start, end, _HEADER_LEN)
+            expected_response_len = _HEADER_STRUCT.unpack_from(response_buff, start)[0]
+            start += _HEADER_LEN
+            response_buff, start, end = self._fill(response_buff, start, end, expected_response_len)
+            with memoryview(response_buff) as view:
+                responses.append(bytes(view[start : start + expected_response_len]))
+            start += expected_response_len
+        return responses
+
+    def _fill(
+        self, response_buff: bytearray, start: int, end: int, min_len: int
+    ) -> tuple[bytearray, int, int]:
+        """Make sure at least min_len unprocessed bytes are in response_buff, moving them
+           to a new buffer if there is not enough space after them.
+        """
+        if end - start >= min_len:
+            return response_buff, start, end
+        if start + min_len > len(response_buff):
+            new_buff = bytearray(max(min_len, _RECV_BUFF_SIZE))
+            with memoryview(response_buff) as view:
+                new_buff[: end - start] = view[start:end]
+            response_buff, start, end = new_buff, 0, end - start
+
+        with memoryview(response_buff) as view:
+            end += _recv_into(self.conn, view[end:], start + min_len - end)
+        if end - start < min_len:
             raise exceptions.CommunicationError(
-                f"Expected {expected_response_len}, got {retrieved} Bytes."
+                f"Expected {min_len}, got {end - start} Bytes."
             )
+        return response_buff, start, end
+
+
+def _send_buffers(conn: socket.socket, buffers: list[bytes]) -> None:
+    """Send all buffers, using one sendmsg call where possible to avoid joining them."""
+    if not hasattr(conn, "sendmsg"):
+        try:
+            conn.sendall(b"".join(buffers))
+        except (TimeoutError, socket.timeout):
+            raise exceptions.ServerTookTooLong from None
+        return
+
+    views = [memoryview(buffer) for buffer in buffers]
+    sent_count = 0
+    while sent_count < len(views):
+        try:
+            sent = conn.sendmsg(views[sent_count : sent_count + _SENDMSG_MAX_BUFFERS])
+        except (TimeoutError, socket.timeout):
+            raise exceptions.ServerTookTooLong from None
+        # skip fully sent buffers and advance the partially sent one
+        while sent_count < len(views) and sent >= len(views[sent_count]):
+            sent -= len(views[sent_count])
+            sent_count += 1
+        if sent:
+            views[sent_count] = views[sent_count][sent:]
+
 
-        return response_buff
+def _recv_into(conn: socket.socket, view: memoryview, min_len: int) -> int:
+    """Receive at least min_len bytes into view, return number of retrieved bytes
+       (less than min_len on EOF).
+    """
+    retrieved = 0
+    while retrieved < min_len:
+        try:
+            received = conn.recv_into(view[retrieved:])
+        except (TimeoutError, socket.timeout):
+            raise exceptions.ServerTookTooLong from None
+        if not received:
+            break
+        retrieved += received
+    return retrieved
@@ -0,0 +1,51 @@
+import array
+import unittest
+
+from internal_client.client_base import ClientBase
+from internal_client.protobuf_clients import InternalProtocol_pb2 as internalProto
+
+
+class TestMessages(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.client = ClientBase(
+            module_id=1,
+            hostname="127.0.0.1",
+            port=8888,
+            device_name="button1",
+            device_type=3,
+            device_role="left_button",
+            device_priority=2,
+        )
+
+    def _reference_status(self, status_data: bytes) -> internalProto.InternalClient:
+        msg = internalProto.InternalClient()
+        msg.deviceStatus.device.CopyFrom(self.client._device_message)
+        msg.deviceStatus.statusData = status_data
+        return msg
+
+    def test_device_connect_is_byte_identical(self):
+        msg = internalProto.InternalClient()
+        msg.deviceConnect.device.CopyFrom(self.client._device_message)
+        self.assertEqual(self.client._create_DeviceConnect_message(), msg.SerializeToString())
+
+    def test_device_status_parses_equal(self):
+        payloads = {
+            "empty": b"",
+            "bytes": b'{"pressed": true}',
+            "long": b"x" * 300,
+            "bytearray": bytearray(b"abc"),
+            "memoryview": memoryview(b"0123456789")[2:8],
+            "non-contiguous memoryview": memoryview(b"123456")[::2],
+            "array": array.array("i", [1, 2, 3]),
+            "array memoryview": memoryview(array.array("i", [1, 2, 3])),
+        }
+        for name, payload in payloads.items():
+            with self.subTest(name):
+                status = self.client._create_DeviceStatus_message(payload)
+                parsed = internalProto.InternalClient.FromString(status)
+                self.assertEqual(parsed, self._reference_status(bytes(payload)))
+
+
+if __name__ == "__main__":
+    unittest.main()